@@ -14,6 +14,7 @@ Pillow 11.1.0
 PyInstaller 6.11.1
 """
 
+import os
 import sys
 import ctypes
 from PyQt6.QtWidgets import (
@@ -21,8 +22,8 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtGui import QIcon, QPixmap
 from PyQt6.QtCore import Qt, QEvent, QSize
-from PIL import Image
 from PicFusion_ui import Ui_MainWindow
+from PicFusion_core import DEFAULT_EXPORT_TARGETS, load_images, merge_images, save_merged_image, target_path
 
 
 def set_app_user_model_id(app_id: str):
@@ -32,6 +33,7 @@ def set_app_user_model_id(app_id: str):
 
 ICON_SIZE = QSize(100, 100)
 SUPPORTED_FORMATS = ('.png', '.jpg', '.jpeg', '.bmp')
+EXPORT_TARGETS = DEFAULT_EXPORT_TARGETS  # Full, web and thumbnail sizes written next to the chosen file
 
 
 class DragDropListWidget(QListWidget):
@@ -169,56 +171,44 @@ class ImageMergerApp(QMainWindow, Ui_MainWindow):
             return
 
         try:
-            image_objects = [Image.open(path) for path in image_paths]
+            image_objects = load_images(image_paths)
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to open images: {e}")
             return
 
-        if self.resize_checkbox.isChecked():
-            min_width = min(img.width for img in image_objects)
-            min_height = min(img.height for img in image_objects)
-            image_objects = [img.resize((min_width, min_height), Image.Resampling.LANCZOS) for img in image_objects]
-
-        merged_image = None
-
         selected_layout = self.layout_combo_box.currentText()
 
-        if selected_layout == 'Vertical':
-            total_width = max(img.width for img in image_objects)
-            total_height = sum(img.height for img in image_objects)
-            merged_image = Image.new('RGB', (total_width, total_height))
-            y_offset = 0
-            for img in image_objects:
-                merged_image.paste(img, (0, y_offset))
-                y_offset += img.height
-        elif selected_layout == 'Horizontal':
-            total_width = sum(img.width for img in image_objects)
-            total_height = max(img.height for img in image_objects)
-            merged_image = Image.new('RGB', (total_width, total_height))
-            x_offset = 0
-            for img in image_objects:
-                merged_image.paste(img, (x_offset, 0))
-                x_offset += img.width
-        elif selected_layout == 'Grid':
-            import math
-            grid_size = math.ceil(math.sqrt(len(image_objects)))
-            max_width = max(img.width for img in image_objects)
-            max_height = max(img.height for img in image_objects)
-            total_width = max_width * grid_size
-            total_height = max_height * grid_size
-            merged_image = Image.new('RGB', (total_width, total_height))
-            for idx, img in enumerate(image_objects):
-                x_offset = (idx % grid_size) * max_width
-                y_offset = (idx // grid_size) * max_height
-                merged_image.paste(img, (x_offset, y_offset))
+        try:
+            merged_image = merge_images(image_objects, selected_layout, resize=self.resize_checkbox.isChecked())
+        except ValueError:
+            merged_image = None
 
         if merged_image:
             file_dialog = QFileDialog()
             save_path, _ = file_dialog.getSaveFileName(self, "Save Merged Image", "", "Images (*.png *.jpg *.jpeg *.bmp)")
 
             if save_path:
-                merged_image.save(save_path)
-                QMessageBox.information(self, "Completed", "The merged image has been successfully saved.")
+                # The dialog only confirms overwriting the main file, so ask about the extra sizes here
+                extra_paths = [target_path(save_path, target) for target in EXPORT_TARGETS]
+                existing = [path for path in extra_paths if path != save_path and os.path.exists(path)]
+                if existing:
+                    answer = QMessageBox.question(
+                        self, "Confirm Overwrite",
+                        "These files already exist and will be replaced:\n" + "\n".join(existing)
+                    )
+                    if answer != QMessageBox.StandardButton.Yes:
+                        QMessageBox.warning(self, "Warning", "Save operation was cancelled.")
+                        return
+
+                try:
+                    saved_paths = save_merged_image(merged_image, save_path, EXPORT_TARGETS)
+                except Exception as e:
+                    QMessageBox.critical(self, "Error", f"Failed to save merged image: {e}")
+                    return
+                QMessageBox.information(
+                    self, "Completed",
+                    "The merged image has been successfully saved:\n" + "\n".join(saved_paths)
+                )
             else:
                 QMessageBox.warning(self, "Warning", "Save operation was cancelled.")
         else:
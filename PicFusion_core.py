@@ -0,0 +1,182 @@
+# Author: yilmaz-mert
+# Version: 1.2.0
+# Date: 2026-10-18
+
+"""
+Headless merge and export logic shared by the PicFusion front ends.
+Images are composited once into a single canvas, and every requested output size is produced
+from that canvas through a cascaded downsample chain, then encoded concurrently.
+No Qt imports live here so the functions can run in worker threads and processes.
+"""
+
+import io
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from PIL import Image
+
+
+LAYOUTS = ('Vertical', 'Horizontal', 'Grid')
+
+EXTENSION_FORMATS = {
+    '.png': 'PNG',
+    '.jpg': 'JPEG',
+    '.jpeg': 'JPEG',
+    '.bmp': 'BMP',
+    '.webp': 'WEBP',
+}
+FORMAT_EXTENSIONS = {
+    'PNG': '.png',
+    'JPEG': '.jpg',
+    'BMP': '.bmp',
+    'WEBP': '.webp',
+}
+
+
+@dataclass(frozen=True)
+class ExportTarget:
+    # One output of the save step.
+    # scale shrinks the canvas by a factor, max_dimension caps its longest side; both may be combined.
+    # format falls back to the save path extension, profile holds encoder options such as quality.
+    suffix: str = ''
+    scale: float = 1.0
+    max_dimension: int | None = None
+    format: str | None = None
+    profile: dict = field(default_factory=dict)
+
+    def output_size(self, size):
+        # Compute the target size for a canvas of the given size, preserving the aspect ratio
+        width, height = size
+        factor = min(self.scale, 1.0)
+        if self.max_dimension:
+            factor = min(factor, self.max_dimension / max(width, height))
+        return max(1, round(width * factor)), max(1, round(height * factor))
+
+
+FULL_TARGET = ExportTarget()
+DEFAULT_EXPORT_TARGETS = (
+    FULL_TARGET,
+    ExportTarget(suffix='_web', max_dimension=1920, format='JPEG', profile={'quality': 85, 'optimize': True}),
+    ExportTarget(suffix='_thumb', max_dimension=320, format='JPEG', profile={'quality': 80}),
+)
+
+
+def load_images(image_paths):
+    # Open every image path; decoding is deferred by Pillow until the pixels are needed
+    return [Image.open(path) for path in image_paths]
+
+
+def resize_to_smallest(image_objects):
+    # Resize images to the smallest width and height among them
+    min_width = min(img.width for img in image_objects)
+    min_height = min(img.height for img in image_objects)
+    return [img.resize((min_width, min_height), Image.Resampling.LANCZOS) for img in image_objects]
+
+
+def layout_positions(sizes, layout):
+    # Compute the canvas size and the paste offset of each image for the given layout
+    if not sizes:
+        raise ValueError("No images to merge.")
+
+    if layout == 'Vertical':
+        total_width = max(width for width, _ in sizes)
+        positions = []
+        y_offset = 0
+        for _, height in sizes:
+            positions.append((0, y_offset))
+            y_offset += height
+        return (total_width, y_offset), positions
+    if layout == 'Horizontal':
+        total_height = max(height for _, height in sizes)
+        positions = []
+        x_offset = 0
+        for width, _ in sizes:
+            positions.append((x_offset, 0))
+            x_offset += width
+        return (x_offset, total_height), positions
+    if layout == 'Grid':
+        grid_size = math.ceil(math.sqrt(len(sizes)))
+        max_width = max(width for width, _ in sizes)
+        max_height = max(height for _, height in sizes)
+        positions = [((idx % grid_size) * max_width, (idx // grid_size) * max_height) for idx in range(len(sizes))]
+        return (max_width * grid_size, max_height * grid_size), positions
+
+    raise ValueError(f"Unknown layout: {layout}")
+
+
+def merge_images(image_objects, layout, resize=False):
+    # Paste the images into a single RGB canvas following the selected layout
+    if resize and image_objects:
+        image_objects = resize_to_smallest(image_objects)
+
+    canvas_size, positions = layout_positions([img.size for img in image_objects], layout)
+    merged_image = Image.new('RGB', canvas_size)
+    for img, position in zip(image_objects, positions):
+        merged_image.paste(img, position)
+    return merged_image
+
+
+def target_path(save_path, target):
+    # Build the output path of a target from the user-selected save path
+    root, extension = os.path.splitext(save_path)
+    if target.format:
+        extension = FORMAT_EXTENSIONS.get(target.format.upper(), extension)
+    return f"{root}{target.suffix}{extension}"
+
+
+def target_format(path, target):
+    # Resolve the Pillow format name of a target
+    if target.format:
+        return target.format.upper()
+    return EXTENSION_FORMATS.get(os.path.splitext(path)[1].lower())
+
+
+def downsample_chain(canvas, targets):
+    # Produce one image per target, deriving each size from the smallest already computed image
+    # that is still at least as large, so the full canvas is only resampled once
+    sizes = [target.output_size(canvas.size) for target in targets]
+    rendered = {canvas.size: canvas}
+    for size in sorted(set(sizes), key=lambda s: s[0] * s[1], reverse=True):
+        if size in rendered:
+            continue
+        source = min(
+            (img for img in rendered.values() if img.width >= size[0] and img.height >= size[1]),
+            key=lambda img: img.width * img.height,
+        )
+        rendered[size] = source.resize(size, Image.Resampling.LANCZOS, reducing_gap=3.0)
+
+    # Targets of the same size get their own copy: Image.save keeps per-call encoder settings on the
+    # image, so one object must never be saved from two threads at once
+    images = []
+    handed_out = set()
+    for size in sizes:
+        image = rendered[size]
+        images.append(image.copy() if size in handed_out else image)
+        handed_out.add(size)
+    return images
+
+
+def encode_image(image, path, image_format, profile):
+    # Encode a single image to disk
+    image.save(path, format=image_format, **profile)
+    return path
+
+
+def save_merged_image(merged_image, save_path, targets=(FULL_TARGET,), max_workers=None):
+    # Save every target from the merged canvas and return the written paths in target order
+    rendered = downsample_chain(merged_image, targets)
+    with ThreadPoolExecutor(max_workers=max_workers or len(targets)) as executor:
+        futures = []
+        for target, image in zip(targets, rendered):
+            path = target_path(save_path, target)
+            futures.append(executor.submit(encode_image, image, path, target_format(path, target), target.profile))
+        return [future.result() for future in futures]
+
+
+def encode_to_bytes(merged_image, target=FULL_TARGET, default_format='PNG'):
+    # Encode a single target in memory, for callers that send the result instead of writing it
+    image = downsample_chain(merged_image, [target])[0]
+    buffer = io.BytesIO()
+    image.save(buffer, format=(target.format or default_format).upper(), **target.profile)
+    return buffer.getvalue()
@@ -0,0 +1,137 @@
+# Author: yilmaz-mert
+# Version: 1.2.0
+# Date: 2026-10-18
+
+"""
+Load test for the local PicFusion merge service.
+Keeps a number of keep-alive connections busy with merge jobs for a fixed duration and reports the
+sustained requests per second, the latency distribution and the service metrics at the end.
+
+Usage:
+    python PicFusion_service.py --port 8765 &
+    python PicFusion_loadtest.py [--port 8765 | --unix /tmp/picfusion.sock] [--concurrency 8] [--duration 30]
+"""
+
+import argparse
+import asyncio
+import base64
+import io
+import json
+import time
+from collections import Counter
+from PIL import Image
+from PicFusion_core import LAYOUTS
+from PicFusion_service import DEFAULT_HOST, DEFAULT_PORT, summarize
+
+
+def build_job(count, size, layout, image_format):
+    # Build one JSON job with generated images uploaded as base64
+    images = []
+    for idx in range(count):
+        img = Image.new('RGB', size, ((idx * 53) % 256, (idx * 97) % 256, (idx * 151) % 256))
+        buffer = io.BytesIO()
+        img.save(buffer, format='PNG')
+        images.append(base64.b64encode(buffer.getvalue()).decode('ascii'))
+    job = {'images': images, 'layout': layout, 'output': {'targets': [{'format': image_format}]}}
+    return json.dumps(job).encode('utf-8')
+
+
+async def open_connection(args):
+    if args.unix:
+        return await asyncio.open_unix_connection(args.unix)
+    return await asyncio.open_connection(args.host, args.port)
+
+
+async def request(reader, writer, method, path, body=b''):
+    # Send one HTTP/1.1 request on a keep-alive connection and read the full response
+    head = f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n"
+    if body:
+        head += "Content-Type: application/json\r\n"
+    writer.write(head.encode('latin-1') + b'\r\n' + body)
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    if headers.get('transfer-encoding') == 'chunked':
+        chunks = []
+        while True:
+            length = int((await reader.readline()).strip(), 16)
+            chunks.append(await reader.readexactly(length + 2))
+            if not length:
+                break
+        data = b''.join(chunk[:-2] for chunk in chunks)
+    else:
+        data = await reader.readexactly(int(headers.get('content-length', 0)))
+    return status, headers, data
+
+
+async def client(args, body, deadline, latencies, statuses):
+    # Send jobs back to back on one connection until the deadline
+    reader, writer = await open_connection(args)
+    try:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            status, headers, _ = await request(reader, writer, 'POST', '/merge', body)
+            statuses[status] += 1
+            if status == 200:
+                latencies.append(time.perf_counter() - started)
+            elif status == 503:
+                await asyncio.sleep(float(headers.get('retry-after', 1)))
+            if headers.get('connection') == 'close':
+                writer.close()
+                reader, writer = await open_connection(args)
+    finally:
+        writer.close()
+
+
+async def run(args):
+    body = build_job(args.images, (args.width, args.height), args.layout, args.format)
+    latencies = []
+    statuses = Counter()
+
+    started = time.perf_counter()
+    deadline = started + args.duration
+    await asyncio.gather(*(client(args, body, deadline, latencies, statuses) for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+
+    reader, writer = await open_connection(args)
+    _, _, metrics = await request(reader, writer, 'GET', '/metrics')
+    writer.close()
+
+    print(f"Duration:      {elapsed:.1f} s")
+    print(f"Concurrency:   {args.concurrency}")
+    print(f"Job:           {args.images} x {args.width}x{args.height} images, {args.layout}, {len(body) / 1024:.0f} KiB")
+    print(f"Responses:     {dict(statuses)}")
+    print(f"Throughput:    {statuses[200] / elapsed:.2f} requests/s")
+    print(f"Latency (ms):  {summarize(latencies)}")
+    print(f"Service:       {json.dumps(json.loads(metrics), indent=2)}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Measure sustained throughput of the PicFusion merge service.")
+    parser.add_argument('--host', default=DEFAULT_HOST, help="Service address (default: 127.0.0.1).")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="Service TCP port (default: 8765).")
+    parser.add_argument('--unix', help="Connect to a Unix socket at this path instead of TCP.")
+    parser.add_argument('-c', '--concurrency', type=int, default=8, help="Number of concurrent connections.")
+    parser.add_argument('-d', '--duration', type=float, default=30.0, help="Test duration in seconds.")
+    parser.add_argument('-n', '--images', type=int, default=4, help="Images per job.")
+    parser.add_argument('--width', type=int, default=640, help="Width of each generated image.")
+    parser.add_argument('--height', type=int, default=480, help="Height of each generated image.")
+    parser.add_argument('-l', '--layout', choices=LAYOUTS, default='Grid', help="Merge layout.")
+    parser.add_argument('-f', '--format', default='JPEG', help="Output format requested from the service.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    asyncio.run(run(parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,589 @@
+# Author: yilmaz-mert
+# Version: 1.2.0
+# Date: 2026-10-18
+
+"""
+Local merge service for PicFusion.
+Tools on the same machine can send merge jobs over HTTP (TCP on localhost or a Unix socket) instead of
+driving the desktop application. Jobs are queued with backpressure and a cap on the estimated memory of the
+jobs in flight, merged on a process pool, and the result is streamed back to the client.
+
+Endpoints:
+    POST /merge    JSON job, see below. Returns the merged image, or a JSON list of written paths.
+    GET  /health   Liveness and queue depth; "degraded" for a while after a merge process died.
+    GET  /metrics  Queue depth, memory in flight, counters and per-stage latency.
+
+A job looks like:
+    {
+        "paths": ["a.png", "b.png"],            # relative to --input-root, or "images": ["<base64>", ...]
+        "layout": "Vertical",                   # Vertical, Horizontal or Grid
+        "resize": false,
+        "output": {                             # optional, defaults to a full size PNG in the response
+            "path": "merged.png",               # optional, relative to --output-root; write to disk instead
+            "targets": [{"suffix": "", "scale": 1.0, "max_dimension": null, "format": "PNG", "profile": {}}]
+        }
+    }
+
+Requests must be sent as Content-Type: application/json with a local Host and no Origin header, so a web page
+cannot drive the service from the browser. Reading files needs --input-root and writing files needs --output-root.
+
+Usage:
+    python PicFusion_service.py [--port 8765 | --unix /tmp/picfusion.sock] [--workers 4]
+                                [--input-root DIR] [--output-root DIR]
+"""
+
+import argparse
+import asyncio
+import base64
+import functools
+import io
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http import HTTPStatus
+from PIL import Image
+from PicFusion_core import (
+    ExportTarget, FULL_TARGET, LAYOUTS, encode_to_bytes, merge_images, save_merged_image, target_format, target_path
+)
+
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+MAX_BODY_SIZE = 256 * 1024 * 1024
+MAX_IN_FLIGHT_MEMORY = 2 * 1024 * 1024 * 1024
+QUEUE_SIZE = 64
+STREAM_CHUNK_SIZE = 64 * 1024
+LATENCY_WINDOW = 1000
+DEGRADED_WINDOW = 60.0
+STAGES = ('queue', 'decode', 'merge', 'encode', 'total')
+LOCAL_HOSTS = ('localhost', '127.0.0.1', '::1')
+
+CONTENT_TYPES = {
+    'PNG': 'image/png',
+    'JPEG': 'image/jpeg',
+    'BMP': 'image/bmp',
+    'WEBP': 'image/webp',
+}
+
+
+class JobError(Exception):
+    # Raised for jobs that can be answered with an HTTP error status
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+    def __reduce__(self):
+        # Keep the status when the error is raised in a worker process and sent back to the service
+        return JobError, (self.status, str(self))
+
+
+def image_error(e):
+    # Map a Pillow failure on client data to the HTTP status it deserves
+    if isinstance(e, Image.DecompressionBombError):
+        return JobError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"Image is too large: {e}")
+    return JobError(HTTPStatus.BAD_REQUEST, f"Failed to open image: {e}")
+
+
+def parse_target(spec, save_path):
+    # Build an ExportTarget from its JSON description, rejecting anything the worker could not encode
+    if not isinstance(spec, dict):
+        raise JobError(HTTPStatus.BAD_REQUEST, "Each target must be an object.")
+
+    suffix = spec.get('suffix', '')
+    if not isinstance(suffix, str) or '/' in suffix or os.sep in suffix:
+        raise JobError(HTTPStatus.BAD_REQUEST, "Target 'suffix' must be a string without path separators.")
+
+    scale = spec.get('scale', 1.0)
+    if isinstance(scale, bool) or not isinstance(scale, (int, float)) or scale <= 0:
+        raise JobError(HTTPStatus.BAD_REQUEST, "Target 'scale' must be a positive number.")
+
+    max_dimension = spec.get('max_dimension')
+    if max_dimension is not None:
+        if isinstance(max_dimension, bool) or not isinstance(max_dimension, int) or max_dimension <= 0:
+            raise JobError(HTTPStatus.BAD_REQUEST, "Target 'max_dimension' must be a positive integer.")
+
+    image_format = spec.get('format')
+    if image_format is not None and (not isinstance(image_format, str) or image_format.upper() not in CONTENT_TYPES):
+        raise JobError(HTTPStatus.BAD_REQUEST, f"Unsupported format: {image_format}. Use one of {', '.join(CONTENT_TYPES)}.")
+
+    profile = spec.get('profile', {})
+    if not isinstance(profile, dict):
+        raise JobError(HTTPStatus.BAD_REQUEST, "Target 'profile' must be an object.")
+
+    target = ExportTarget(suffix=suffix, scale=float(scale), max_dimension=max_dimension, format=image_format, profile=profile)
+    if save_path and target_format(target_path(save_path, target), target) not in CONTENT_TYPES:
+        raise JobError(HTTPStatus.BAD_REQUEST, f"Cannot tell the image format of {save_path}, set the target format.")
+    return target
+
+
+def resolve_under(root, path, option):
+    # Resolve a client path inside a configured root folder, refusing anything that escapes it
+    if root is None:
+        raise JobError(HTTPStatus.FORBIDDEN, f"File access is disabled, start the service with {option}.")
+    resolved = os.path.realpath(os.path.join(root, path))
+    if os.path.commonpath([resolved, root]) != root:
+        raise JobError(HTTPStatus.FORBIDDEN, f"Path is outside {option}: {path}")
+    return resolved
+
+
+def parse_sources(job, input_root=None):
+    # Return the file paths or the decoded uploads of a job
+    paths = job.get('paths')
+    images = job.get('images')
+    if paths is not None:
+        if not isinstance(paths, list) or not paths or not all(isinstance(path, str) for path in paths):
+            raise JobError(HTTPStatus.BAD_REQUEST, "'paths' must be a non-empty list of file paths.")
+        resolved = [resolve_under(input_root, path, '--input-root') for path in paths]
+        for path, resolved_path in zip(paths, resolved):
+            if not os.path.isfile(resolved_path):
+                raise JobError(HTTPStatus.BAD_REQUEST, f"File not found: {path}")
+        return resolved
+    if images is not None:
+        if not isinstance(images, list) or not images or not all(isinstance(data, str) for data in images):
+            raise JobError(HTTPStatus.BAD_REQUEST, "'images' must be a non-empty list of base64 strings.")
+        try:
+            return [base64.b64decode(data, validate=True) for data in images]
+        except ValueError as e:
+            raise JobError(HTTPStatus.BAD_REQUEST, f"Invalid base64 image: {e}")
+    raise JobError(HTTPStatus.BAD_REQUEST, "Job must contain 'paths' or 'images'.")
+
+
+def parse_job(body, input_root=None, output_root=None):
+    # Validate a JSON job and return the arguments passed to the worker process.
+    # Paths are resolved inside the input and output roots; a root of None disables that kind of file access.
+    try:
+        job = json.loads(body)
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise JobError(HTTPStatus.BAD_REQUEST, f"Invalid JSON: {e}")
+    if not isinstance(job, dict):
+        raise JobError(HTTPStatus.BAD_REQUEST, "Job must be a JSON object.")
+
+    layout = job.get('layout', 'Vertical')
+    if layout not in LAYOUTS:
+        raise JobError(HTTPStatus.BAD_REQUEST, f"Unknown layout: {layout}")
+    resize = job.get('resize', False)
+    if not isinstance(resize, bool):
+        raise JobError(HTTPStatus.BAD_REQUEST, "'resize' must be true or false.")
+
+    sources = parse_sources(job, input_root)
+
+    output = job.get('output') or {}
+    if not isinstance(output, dict):
+        raise JobError(HTTPStatus.BAD_REQUEST, "'output' must be an object.")
+    save_path = output.get('path')
+    if save_path is not None:
+        if not isinstance(save_path, str) or not save_path:
+            raise JobError(HTTPStatus.BAD_REQUEST, "Output 'path' must be a non-empty string.")
+        save_path = resolve_under(output_root, save_path, '--output-root')
+        if not os.path.isdir(os.path.dirname(save_path)):
+            raise JobError(HTTPStatus.BAD_REQUEST, f"Output folder does not exist: {output['path']}")
+    target_specs = output.get('targets', [])
+    if not isinstance(target_specs, list):
+        raise JobError(HTTPStatus.BAD_REQUEST, "Output 'targets' must be a list.")
+    targets = tuple(parse_target(spec, save_path) for spec in target_specs)
+    if not targets:
+        targets = (parse_target({}, save_path),) if save_path else (FULL_TARGET,)
+    if not save_path and len(targets) > 1:
+        raise JobError(HTTPStatus.BAD_REQUEST, "Several targets require an output path.")
+
+    return {
+        'sources': sources,
+        'layout': layout,
+        'resize': resize,
+        'save_path': save_path,
+        'targets': targets,
+    }
+
+
+def body_memory(length):
+    # Memory held for a request body: the raw bytes plus the strings parsed out of the JSON
+    return length * 2
+
+
+def estimate_memory(sources, body_size=0):
+    # Estimate the peak memory of a job: the request body, the decoded uploads,
+    # and from the image headers the decoded sources plus the merged canvas
+    pixels = 0
+    raw_bytes = 0
+    for source in sources:
+        if isinstance(source, bytes):
+            raw_bytes += len(source)
+            source = io.BytesIO(source)
+        try:
+            with Image.open(source) as img:
+                pixels += img.width * img.height
+        except (OSError, SyntaxError, Image.DecompressionBombError) as e:
+            raise image_error(e)
+    return body_memory(body_size) + raw_bytes + pixels * 4 * 2
+
+
+def run_merge_job(sources, layout, resize, save_path, targets):
+    # Worker process entry point: decode, merge and encode a job, timing each stage
+    started = time.perf_counter()
+    image_objects = []
+    for source in sources:
+        # A truncated image passes the header-only estimate and only fails here
+        try:
+            img = Image.open(io.BytesIO(source) if isinstance(source, bytes) else source)
+            img.load()
+        except (OSError, SyntaxError, Image.DecompressionBombError) as e:
+            raise image_error(e)
+        image_objects.append(img)
+    decoded = time.perf_counter()
+
+    merged_image = merge_images(image_objects, layout, resize=resize)
+    merged = time.perf_counter()
+
+    if save_path:
+        result = save_merged_image(merged_image, save_path, targets)
+    else:
+        result = encode_to_bytes(merged_image, targets[0])
+    encoded = time.perf_counter()
+
+    timings = {'decode': decoded - started, 'merge': merged - decoded, 'encode': encoded - merged}
+    return result, timings
+
+
+class MergeService:
+    def __init__(self, workers=None, queue_size=QUEUE_SIZE, max_memory=MAX_IN_FLIGHT_MEMORY, input_root=None,
+                 output_root=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.input_root = os.path.realpath(input_root) if input_root else None
+        self.output_root = os.path.realpath(output_root) if output_root else None
+        self.queue_size = queue_size
+        self.max_memory = max_memory
+        self.queue = None
+        self.pool = None
+        self.tasks = []
+        self.in_flight_memory = 0
+        self.in_flight_jobs = 0
+        self.counters = {'accepted': 0, 'completed': 0, 'failed': 0, 'rejected': 0, 'pool_restarts': 0}
+        self.last_pool_failure = None
+        self.latencies = {stage: deque(maxlen=LATENCY_WINDOW) for stage in STAGES}
+        self.started = time.monotonic()
+
+    async def start(self):
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        self.tasks = [asyncio.create_task(self.worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.pool.shutdown(wait=True, cancel_futures=True)
+
+    async def worker(self):
+        # Feed queued jobs to the process pool, one job per pool process at a time
+        loop = asyncio.get_running_loop()
+        while True:
+            job, future, queued_at = await self.queue.get()
+            self.latencies['queue'].append(time.perf_counter() - queued_at)
+            pool = self.pool
+            try:
+                result, timings = await loop.run_in_executor(pool, functools.partial(run_merge_job, **job))
+            except BrokenProcessPool:
+                self.restart_pool(pool)
+                if not future.done():
+                    future.set_exception(JobError(HTTPStatus.INTERNAL_SERVER_ERROR, "A merge process died, the job was dropped."))
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                for stage, seconds in timings.items():
+                    self.latencies[stage].append(seconds)
+                if not future.done():
+                    future.set_result(result)
+            finally:
+                self.queue.task_done()
+
+    def restart_pool(self, broken_pool):
+        # Replace a pool whose process died; every job running on it fails, so only the first caller rebuilds it
+        self.last_pool_failure = time.monotonic()
+        if self.pool is not broken_pool:
+            return
+        print("A merge process died, restarting the process pool.", file=sys.stderr)
+        self.counters['pool_restarts'] += 1
+        self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        broken_pool.shutdown(wait=False, cancel_futures=True)
+
+    def admit(self, memory, held=0):
+        # Reserve memory against the in-flight budget, or reject with 503.
+        # held is what the caller already reserved; a request alone in the service is always admitted.
+        if self.in_flight_memory > held and self.in_flight_memory + memory > self.max_memory:
+            self.counters['rejected'] += 1
+            raise JobError(HTTPStatus.SERVICE_UNAVAILABLE, "Memory budget is exhausted, retry later.")
+        self.in_flight_memory += memory
+        return memory
+
+    def release(self, memory):
+        self.in_flight_memory -= memory
+
+    async def merge(self, body, held=0):
+        # Admit a job, wait for its result and release its memory budget once done.
+        # held is the memory already reserved for the request body.
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        job = await loop.run_in_executor(None, parse_job, body, self.input_root, self.output_root)
+        memory = await loop.run_in_executor(None, estimate_memory, job['sources'], len(body))
+
+        if self.queue.full():
+            self.counters['rejected'] += 1
+            raise JobError(HTTPStatus.SERVICE_UNAVAILABLE, "Merge queue is full, retry later.")
+        memory = self.admit(max(0, memory - held), held)
+
+        self.counters['accepted'] += 1
+        self.in_flight_jobs += 1
+        future = loop.create_future()
+        self.queue.put_nowait((job, future, time.perf_counter()))
+        try:
+            result = await future
+        except Exception:
+            self.counters['failed'] += 1
+            raise
+        finally:
+            self.in_flight_jobs -= 1
+            self.release(memory)
+        self.counters['completed'] += 1
+        self.latencies['total'].append(time.perf_counter() - started)
+        return job, result
+
+    def health(self):
+        degraded = self.last_pool_failure is not None and time.monotonic() - self.last_pool_failure < DEGRADED_WINDOW
+        return {
+            'status': 'degraded' if degraded else 'ok',
+            'workers': self.workers,
+            'pool_restarts': self.counters['pool_restarts'],
+            'queue_depth': self.queue.qsize(),
+            'uptime': round(time.monotonic() - self.started, 3),
+        }
+
+    def metrics(self):
+        return {
+            'queue_depth': self.queue.qsize(),
+            'queue_size': self.queue_size,
+            'in_flight_jobs': self.in_flight_jobs,
+            'in_flight_memory': self.in_flight_memory,
+            'max_memory': self.max_memory,
+            **self.counters,
+            'latency_ms': {stage: summarize(samples) for stage, samples in self.latencies.items()},
+        }
+
+
+def summarize(samples):
+    # Summarize recent latency samples in milliseconds
+    if not samples:
+        return {'count': 0}
+    ordered = sorted(samples)
+
+    def percentile(fraction):
+        return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000, 3)
+
+    return {
+        'count': len(ordered),
+        'mean': round(sum(ordered) / len(ordered) * 1000, 3),
+        'p50': percentile(0.5),
+        'p95': percentile(0.95),
+        'p99': percentile(0.99),
+        'max': round(ordered[-1] * 1000, 3),
+    }
+
+
+async def read_line(reader):
+    # Read one header line, answering 431 when it does not fit in the stream buffer
+    try:
+        return await reader.readline()
+    except (ValueError, asyncio.LimitOverrunError):
+        raise JobError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Request header line is too long.")
+
+
+async def read_head(reader, max_body_size):
+    # Read the request line and headers of one HTTP/1.1 request; returns None when the client closed the connection.
+    # The body is left in the stream so the caller can reserve memory for it before reading it.
+    request_line = await read_line(reader)
+    if not request_line:
+        return None
+    try:
+        method, target, version = request_line.decode('latin-1').split()
+    except ValueError:
+        raise JobError(HTTPStatus.BAD_REQUEST, "Malformed request line.")
+
+    headers = {}
+    while True:
+        line = await read_line(reader)
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get('content-length') or 0)
+    except ValueError:
+        raise JobError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length.")
+    if length < 0:
+        raise JobError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length.")
+    if length > max_body_size:
+        raise JobError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body is too large.")
+
+    keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+    return method, target.split('?', 1)[0], length, keep_alive, headers, version
+
+
+async def write_head(writer, status, headers, keep_alive):
+    status = HTTPStatus(status)
+    lines = [f"HTTP/1.1 {status.value} {status.phrase}"]
+    lines += [f"{name}: {value}" for name, value in headers.items()]
+    lines.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+    writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+
+
+async def send_json(writer, status, payload, keep_alive, headers=None):
+    body = json.dumps(payload).encode('utf-8')
+    await write_head(writer, status, {'Content-Type': 'application/json', 'Content-Length': len(body), **(headers or {})}, keep_alive)
+    writer.write(body)
+    await writer.drain()
+
+
+async def send_stream(writer, content_type, data, keep_alive, chunked=True):
+    # Stream the encoded image back in chunks so large results do not sit in the socket buffer at once.
+    # HTTP/1.0 clients do not understand chunked encoding, so they get a Content-Length instead.
+    if chunked:
+        headers = {'Content-Type': content_type, 'Transfer-Encoding': 'chunked'}
+    else:
+        headers = {'Content-Type': content_type, 'Content-Length': len(data)}
+    await write_head(writer, HTTPStatus.OK, headers, keep_alive)
+    view = memoryview(data)
+    for offset in range(0, len(view), STREAM_CHUNK_SIZE):
+        chunk = view[offset:offset + STREAM_CHUNK_SIZE]
+        if chunked:
+            writer.write(f"{len(chunk):x}\r\n".encode('latin-1'))
+            writer.write(chunk)
+            writer.write(b'\r\n')
+        else:
+            writer.write(chunk)
+        await writer.drain()
+    if chunked:
+        writer.write(b'0\r\n\r\n')
+        await writer.drain()
+
+
+class MergeServer:
+    def __init__(self, service, max_body_size=MAX_BODY_SIZE, allowed_hosts=LOCAL_HOSTS):
+        self.service = service
+        self.max_body_size = max_body_size
+        self.allowed_hosts = allowed_hosts
+
+    def check_request(self, method, path, headers):
+        # Refuse requests a web page could make: browsers send an Origin header, can point any hostname at
+        # 127.0.0.1, and only send JSON after a CORS preflight that this service never answers
+        if 'origin' in headers:
+            raise JobError(HTTPStatus.FORBIDDEN, "Cross-origin requests are not allowed.")
+        host = headers.get('host')
+        if host is not None:
+            hostname = host[1:].partition(']')[0] if host.startswith('[') else host.partition(':')[0]
+            if hostname.lower() not in self.allowed_hosts:
+                raise JobError(HTTPStatus.FORBIDDEN, f"Host is not allowed: {host}")
+        if path == '/merge' and method == 'POST':
+            content_type = headers.get('content-type', '').partition(';')[0].strip().lower()
+            if content_type != 'application/json':
+                raise JobError(HTTPStatus.UNSUPPORTED_MEDIA_TYPE, "Jobs must be sent as application/json.")
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                # Until the body has been read the stream position is unknown, so errors close the connection
+                keep_alive = False
+                reserved = 0
+                try:
+                    head = await read_head(reader, self.max_body_size)
+                    if head is None:
+                        break
+                    method, path, length, request_keep_alive, headers, version = head
+                    self.check_request(method, path, headers)
+                    if path == '/merge' and method == 'POST':
+                        reserved = self.service.admit(body_memory(length))
+                    body = await reader.readexactly(length) if length else b''
+                    keep_alive = request_keep_alive
+                    await self.route(writer, method, path, body, keep_alive, reserved, chunked=version == 'HTTP/1.1')
+                except JobError as e:
+                    headers = {'Retry-After': 1} if e.status == HTTPStatus.SERVICE_UNAVAILABLE else None
+                    await send_json(writer, e.status, {'error': str(e)}, keep_alive, headers)
+                finally:
+                    self.service.release(reserved)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def route(self, writer, method, path, body, keep_alive, reserved=0, chunked=True):
+        if path == '/health' and method == 'GET':
+            await send_json(writer, HTTPStatus.OK, self.service.health(), keep_alive)
+        elif path == '/metrics' and method == 'GET':
+            await send_json(writer, HTTPStatus.OK, self.service.metrics(), keep_alive)
+        elif path == '/merge' and method == 'POST':
+            try:
+                job, result = await self.service.merge(body, held=reserved)
+            except JobError:
+                raise
+            except Exception as e:
+                raise JobError(HTTPStatus.INTERNAL_SERVER_ERROR, f"Failed to merge images: {e}")
+            if job['save_path']:
+                await send_json(writer, HTTPStatus.OK, {'paths': result}, keep_alive)
+            else:
+                image_format = (job['targets'][0].format or 'PNG').upper()
+                await send_stream(writer, CONTENT_TYPES.get(image_format, 'application/octet-stream'), result, keep_alive, chunked)
+        elif path in ('/health', '/metrics', '/merge'):
+            raise JobError(HTTPStatus.METHOD_NOT_ALLOWED, f"{method} is not allowed on {path}.")
+        else:
+            raise JobError(HTTPStatus.NOT_FOUND, f"Unknown endpoint: {path}")
+
+
+async def serve(args):
+    service = MergeService(workers=args.workers, queue_size=args.queue_size, max_memory=args.max_memory * 1024 * 1024,
+                           input_root=args.input_root, output_root=args.output_root)
+    await service.start()
+    server = MergeServer(service, allowed_hosts=tuple({*LOCAL_HOSTS, args.host.lower()}))
+    if args.unix:
+        listener = await asyncio.start_unix_server(server.handle_connection, path=args.unix)
+        print(f"PicFusion service listening on {args.unix}")
+    else:
+        listener = await asyncio.start_server(server.handle_connection, args.host, args.port)
+        print(f"PicFusion service listening on http://{args.host}:{args.port}")
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        await service.stop()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the local PicFusion merge service.")
+    parser.add_argument('--host', default=DEFAULT_HOST, help="Address to bind (default: 127.0.0.1).")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="TCP port (default: 8765).")
+    parser.add_argument('--unix', help="Listen on a Unix socket at this path instead of TCP.")
+    parser.add_argument('--workers', type=int, help="Number of merge processes (default: CPU count).")
+    parser.add_argument('--queue-size', type=int, default=QUEUE_SIZE, help="Maximum number of queued jobs.")
+    parser.add_argument('--max-memory', type=int, default=MAX_IN_FLIGHT_MEMORY // (1024 * 1024),
+                        help="Maximum estimated memory of the jobs in flight, in MiB.")
+    parser.add_argument('--input-root', help="Folder jobs may read 'paths' from (default: file input disabled).")
+    parser.add_argument('--output-root', help="Folder jobs may write 'output.path' into (default: file output disabled).")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,320 @@
+# Author: yilmaz-mert
+# Version: 1.2.0
+# Date: 2026-10-18
+
+"""
+Headless hot-folder mode for PicFusion.
+A folder is polled for new images, which are grouped into merge jobs by count, by a debounce
+time window or by a JSON sidecar manifest, and merged with the same Vertical/Horizontal/Grid logic
+as the desktop application.
+Files are only picked up once their size and modification time have stopped changing, so images
+that are still being written are skipped until the next poll.
+Each file is decoded on a background pool as soon as it is picked up, so when a batch gets one more
+file only that file is decoded; the batch is composited once, off the polling thread, when it is flushed.
+
+Usage:
+    python PicFusion_watch.py FOLDER [--layout Grid] [--count 4 | --window 5 | --manifest]
+"""
+
+import argparse
+import json
+import os
+import queue
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from PIL import Image
+from PicFusion_core import DEFAULT_EXPORT_TARGETS, FULL_TARGET, LAYOUTS, merge_images, save_merged_image
+
+
+SUPPORTED_FORMATS = ('.png', '.jpg', '.jpeg', '.bmp')
+MANIFEST_SUFFIX = '.json'
+POLL_INTERVAL = 0.5
+MANIFEST_TIMEOUT = 600.0
+MAX_WAIT = 30.0
+
+
+class Job:
+    # A batch of files merged together into one output; holds the pending decodes in arrival order
+
+    def __init__(self, layout, resize, name=None):
+        self.layout = layout
+        self.resize = resize
+        self.name = name
+        self.paths = []
+        self.decodes = []
+        self.created = time.monotonic()
+        self.last_added = self.created
+
+    def add(self, path, decode):
+        self.paths.append(path)
+        self.decodes.append(decode)
+        self.last_added = time.monotonic()
+
+
+def read_image(path):
+    # Decode an image fully so a truncated file fails here instead of during the merge
+    with Image.open(path) as img:
+        img.load()
+        return img.copy()
+
+
+def read_manifest(path):
+    # Read a sidecar manifest listing the files of a job and optional merge settings
+    with open(path, encoding='utf-8') as manifest_file:
+        manifest = json.load(manifest_file)
+    if not isinstance(manifest, dict):
+        raise ValueError("Manifest must be a JSON object.")
+    files = manifest.get('files')
+    if not isinstance(files, list) or not files or not all(isinstance(name, str) for name in files):
+        raise ValueError("Manifest must contain a non-empty 'files' list of file names.")
+    if 'layout' in manifest and manifest['layout'] not in LAYOUTS:
+        raise ValueError(f"Unknown layout: {manifest['layout']}")
+    if 'resize' in manifest and not isinstance(manifest['resize'], bool):
+        raise ValueError("Manifest 'resize' must be true or false.")
+    if 'output' in manifest and not isinstance(manifest['output'], str):
+        raise ValueError("Manifest 'output' must be a file name.")
+    # Only the file names are used so a manifest cannot point outside the watched and output folders
+    manifest['files'] = [os.path.basename(name) for name in files]
+    if len(set(manifest['files'])) != len(manifest['files']):
+        raise ValueError("Manifest lists the same file name more than once.")
+    if manifest.get('output'):
+        manifest['output'] = os.path.basename(manifest['output'])
+    return manifest
+
+
+class FolderWatcher:
+    def __init__(self, folder, output_dir, layout='Vertical', resize=False, count=None, window=None,
+                 manifest=False, targets=(FULL_TARGET,), poll_interval=POLL_INTERVAL, output_format='png',
+                 manifest_timeout=MANIFEST_TIMEOUT, max_wait=MAX_WAIT):
+        if not (count or window or manifest):
+            raise ValueError("Select a grouping mode: count, window or manifest.")
+        self.folder = folder
+        self.output_dir = output_dir
+        self.layout = layout
+        self.resize = resize
+        self.count = count
+        self.window = window
+        self.manifest = manifest
+        self.targets = targets
+        self.poll_interval = poll_interval
+        self.output_format = output_format
+        self.manifest_timeout = manifest_timeout
+        self.max_wait = max_wait
+
+        self.pending = {}  # path -> (size, mtime_ns) seen on the previous poll, waiting to settle
+        self.seen = {}  # path -> None once handed to a job, or the mtime_ns of a manifest or of a file that failed to decode
+        self.failures = queue.SimpleQueue()  # (path, mtime_ns) reported by the merge threads
+        self.ready = {}  # path -> pick-up time of files available to manifests, kept until the manifest timeout
+        self.manifests = {}  # manifest path -> (pick-up time, parsed manifest)
+        self.job = None
+        self.job_counter = 0
+        self.decoder = ThreadPoolExecutor(max_workers=os.cpu_count() or 1)
+        self.executor = ThreadPoolExecutor(max_workers=2)
+        os.makedirs(self.output_dir, exist_ok=True)
+
+    def scan(self):
+        # Return the files that have not changed since the previous poll.
+        # Files already handed to a job are skipped without a stat, and forgotten once they are deleted.
+        # Manifests and files that failed to decode are picked up again when their mtime changes.
+        settled = []
+        current = {}
+        present = set()
+        with os.scandir(self.folder) as entries:
+            for entry in entries:
+                if not entry.is_file():
+                    continue
+                name = entry.name.lower()
+                if not (name.endswith(SUPPORTED_FORMATS) or (self.manifest and name.endswith(MANIFEST_SUFFIX))):
+                    continue
+                present.add(entry.path)
+                failed_mtime = None
+                if entry.path in self.seen:
+                    failed_mtime = self.seen[entry.path]
+                    if failed_mtime is None:
+                        continue
+                stat = entry.stat()
+                if stat.st_mtime_ns == failed_mtime:
+                    continue
+                signature = (stat.st_size, stat.st_mtime_ns)
+                if stat.st_size and self.pending.get(entry.path) == signature:
+                    settled.append((stat.st_mtime_ns, entry.path))
+                else:
+                    current[entry.path] = signature
+        self.pending = current
+        self.seen = {path: mtime for path, mtime in self.seen.items() if path in present}
+        return [path for _, path in sorted(settled)]
+
+    def poll(self):
+        # Run one watch cycle: pick up settled files, extend jobs and flush the ones that are complete
+        while not self.failures.empty():
+            path, mtime = self.failures.get()
+            if path in self.seen:
+                self.seen[path] = mtime
+
+        for path in self.scan():
+            self.seen[path] = None
+            if path.lower().endswith(MANIFEST_SUFFIX):
+                # A manifest may be rewritten to add a file, or have been read mid-write, so it is watched again
+                try:
+                    self.seen[path] = os.stat(path).st_mtime_ns
+                except FileNotFoundError:
+                    continue
+                self.add_manifest(path)
+            else:
+                self.add_file(path)
+        if self.manifest:
+            self.flush_manifests()
+            self.expire_manifests()
+        elif self.job and self.window:
+            # Under a steady stream the quiet gap never comes, so a job is also flushed once it reaches max_wait
+            now = time.monotonic()
+            if now - self.job.last_added >= self.window or (self.max_wait and now - self.job.created >= self.max_wait):
+                self.flush()
+
+    def add_file(self, path):
+        if self.manifest:
+            self.ready[path] = time.monotonic()
+            return
+
+        if self.job is None:
+            self.job = Job(self.layout, self.resize)
+        self.job.add(path, self.decoder.submit(read_image, path))
+        if self.count and len(self.job.paths) >= self.count:
+            self.flush()
+
+    def add_manifest(self, path):
+        try:
+            self.manifests[path] = (time.monotonic(), read_manifest(path))
+        except (OSError, ValueError) as e:
+            print(f"Skipping manifest {path}: {e}", file=sys.stderr)
+
+    def flush_manifests(self):
+        # Start every manifest job whose files have all been picked up.
+        # Files stay available so a rewritten manifest that adds one more file can be merged again.
+        for manifest_path, (_, manifest) in list(self.manifests.items()):
+            paths = [os.path.join(self.folder, name) for name in manifest['files']]
+            if not all(path in self.ready for path in paths):
+                continue
+            del self.manifests[manifest_path]
+            name = manifest.get('output') or os.path.splitext(os.path.basename(manifest_path))[0]
+            job = Job(manifest.get('layout', self.layout), manifest.get('resize', self.resize), name=name)
+            for path in paths:
+                job.add(path, self.decoder.submit(read_image, path))
+            self.submit(job)
+
+    def expire_manifests(self):
+        # Forget files and manifests that waited longer than the timeout for the rest of their job
+        deadline = time.monotonic() - self.manifest_timeout
+        for path, picked_up in list(self.ready.items()):
+            if picked_up < deadline:
+                del self.ready[path]
+        for path, (picked_up, _) in list(self.manifests.items()):
+            if picked_up < deadline:
+                print(f"Dropping manifest {path}: its files did not arrive in time.", file=sys.stderr)
+                del self.manifests[path]
+
+    def flush(self):
+        # Hand the current job to the merge pool and start a new one on the next file
+        if self.job and self.job.paths:
+            self.submit(self.job)
+        self.job = None
+
+    def submit(self, job):
+        self.job_counter += 1
+        name = job.name or f"merge_{datetime.now():%Y%m%d_%H%M%S}_{self.job_counter:04d}"
+        if not os.path.splitext(name)[1]:
+            name = f"{name}.{self.output_format}"
+        future = self.executor.submit(self.merge_job, job, os.path.join(self.output_dir, name))
+        future.add_done_callback(self.report)
+
+    def merge_job(self, job, save_path):
+        # Composite a job once, skipping files that failed to decode, and save every target
+        image_objects = []
+        for path, decode in zip(job.paths, job.decodes):
+            try:
+                image_objects.append(decode.result())
+            except (OSError, SyntaxError) as e:
+                # Retried only once the file is written again
+                print(f"Skipping {path}: {e}", file=sys.stderr)
+                try:
+                    self.failures.put((path, os.stat(path).st_mtime_ns))
+                except FileNotFoundError:
+                    pass
+        if not image_objects:
+            return 0, []
+        merged_image = merge_images(image_objects, job.layout, resize=job.resize)
+        return len(image_objects), save_merged_image(merged_image, save_path, self.targets)
+
+    @staticmethod
+    def report(future):
+        try:
+            count, paths = future.result()
+        except Exception as e:
+            print(f"Failed to save merged image: {e}", file=sys.stderr)
+        else:
+            if paths:
+                print(f"Merged {count} images into {', '.join(paths)}")
+
+    def run(self):
+        try:
+            while True:
+                started = time.monotonic()
+                try:
+                    self.poll()
+                except Exception as e:
+                    # A bad job or a folder that is briefly unavailable must not stop the watcher
+                    print(f"Watch cycle failed: {e!r}", file=sys.stderr)
+                time.sleep(max(0.0, self.poll_interval - (time.monotonic() - started)))
+        except KeyboardInterrupt:
+            self.flush()
+        finally:
+            self.executor.shutdown(wait=True)
+            self.decoder.shutdown(wait=True)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Watch a folder and merge incoming images automatically.")
+    parser.add_argument('folder', help="Folder to watch for new images.")
+    parser.add_argument('-o', '--output-dir', help="Folder for merged images (default: FOLDER/merged).")
+    parser.add_argument('-l', '--layout', choices=LAYOUTS, default='Vertical', help="Merge layout.")
+    parser.add_argument('-r', '--resize', action='store_true', help="Resize images to the smallest dimensions before merging.")
+    parser.add_argument('-c', '--count', type=int, help="Merge every COUNT images.")
+    parser.add_argument('-w', '--window', type=float, help="Merge once no new image arrived for WINDOW seconds.")
+    parser.add_argument('--max-wait', type=float, default=MAX_WAIT,
+                        help="With --window, merge a job at the latest this many seconds after its first image (0 disables).")
+    parser.add_argument('-m', '--manifest', action='store_true', help="Group files by JSON sidecar manifests.")
+    parser.add_argument('-f', '--format', default='png', help="Output file extension (default: png).")
+    parser.add_argument('--all-sizes', action='store_true', help="Also write web and thumbnail sizes.")
+    parser.add_argument('--interval', type=float, default=POLL_INTERVAL, help="Polling interval in seconds.")
+    parser.add_argument('--manifest-timeout', type=float, default=MANIFEST_TIMEOUT,
+                        help="Seconds a file or manifest waits for the rest of its job before it is dropped.")
+    args = parser.parse_args(argv)
+    if not (args.count or args.window or args.manifest):
+        parser.error("one of --count, --window or --manifest is required")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    watcher = FolderWatcher(
+        args.folder,
+        args.output_dir or os.path.join(args.folder, 'merged'),
+        layout=args.layout,
+        resize=args.resize,
+        count=args.count,
+        window=args.window,
+        manifest=args.manifest,
+        targets=DEFAULT_EXPORT_TARGETS if args.all_sizes else (FULL_TARGET,),
+        poll_interval=args.interval,
+        output_format=args.format.lstrip('.'),
+        manifest_timeout=args.manifest_timeout,
+        max_wait=args.max_wait,
+    )
+    print(f"Watching {args.folder}, press Ctrl+C to stop.")
+    watcher.run()
+
+
+if __name__ == "__main__":
+    main()
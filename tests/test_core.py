@@ -0,0 +1,42 @@
+import os
+import sys
+
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PicFusion_core import DEFAULT_EXPORT_TARGETS, ExportTarget, downsample_chain, save_merged_image
+
+
+def gradient_canvas(size):
+    canvas = Image.new('RGB', size)
+    canvas.putdata([(x % 256, y % 256, (x * y) % 256) for y in range(size[1]) for x in range(size[0])])
+    return canvas
+
+
+def read_outputs(paths):
+    result = []
+    for path in paths:
+        with open(path, 'rb') as output_file:
+            result.append(output_file.read())
+    return result
+
+
+def test_downsample_chain_returns_distinct_images_for_equal_sizes():
+    canvas = gradient_canvas((300, 200))
+    images = downsample_chain(canvas, [ExportTarget(), ExportTarget(max_dimension=1000), ExportTarget(scale=0.5),
+                                       ExportTarget(scale=0.5)])
+    assert len({id(image) for image in images}) == len(images)
+    assert [image.size for image in images] == [(300, 200), (300, 200), (150, 100), (150, 100)]
+
+
+def test_concurrent_save_matches_serial_save(tmp_path):
+    canvas = gradient_canvas((1200, 900))
+    targets = DEFAULT_EXPORT_TARGETS + (
+        ExportTarget(suffix='_a', format='JPEG', profile={'quality': 30}),
+        ExportTarget(suffix='_b', format='JPEG', profile={'quality': 95, 'optimize': True}),
+    )
+    serial = read_outputs(save_merged_image(canvas, str(tmp_path / 'serial.png'), targets, max_workers=1))
+    for run in range(10):
+        paths = save_merged_image(canvas, str(tmp_path / f'concurrent{run}.png'), targets)
+        assert read_outputs(paths) == serial
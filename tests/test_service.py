@@ -0,0 +1,163 @@
+import asyncio
+import base64
+import io
+import json
+import os
+import sys
+from http import HTTPStatus
+
+import pytest
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PicFusion_loadtest import request
+from PicFusion_service import JobError, MergeServer, MergeService, parse_job
+
+
+def encoded_image(size=(40, 30), color='red'):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def job_body(**job):
+    return json.dumps(job).encode('utf-8')
+
+
+@pytest.fixture
+def roots(tmp_path):
+    input_root = tmp_path / 'in'
+    output_root = tmp_path / 'out'
+    input_root.mkdir()
+    output_root.mkdir()
+    (input_root / 'a.png').write_bytes(encoded_image())
+    return str(input_root), str(output_root)
+
+
+@pytest.mark.parametrize('job, status', [
+    ({'paths': 'abc'}, HTTPStatus.BAD_REQUEST),
+    ({'images': ['not base64!']}, HTTPStatus.BAD_REQUEST),
+    ({'paths': ['a.png'], 'layout': 'Diagonal'}, HTTPStatus.BAD_REQUEST),
+    ({'paths': ['a.png'], 'resize': 'no'}, HTTPStatus.BAD_REQUEST),
+    ({'paths': ['missing.png']}, HTTPStatus.BAD_REQUEST),
+    ({'paths': ['../outside.png']}, HTTPStatus.FORBIDDEN),
+    ({'paths': ['a.png'], 'output': {'path': 5}}, HTTPStatus.BAD_REQUEST),
+    ({'paths': ['a.png'], 'output': {'path': '/tmp/elsewhere.png'}}, HTTPStatus.FORBIDDEN),
+    ({'paths': ['a.png'], 'output': {'path': 'x.foo'}}, HTTPStatus.BAD_REQUEST),
+    ({'paths': ['a.png'], 'output': {'targets': [{'format': 'FOO'}]}}, HTTPStatus.BAD_REQUEST),
+    ({'paths': ['a.png'], 'output': {'targets': [{'max_dimension': 'abc'}]}}, HTTPStatus.BAD_REQUEST),
+    ({'paths': ['a.png'], 'output': {'targets': [{'scale': 0}]}}, HTTPStatus.BAD_REQUEST),
+    ({'paths': ['a.png'], 'output': {'path': 'x.png', 'targets': [{'suffix': '/../y'}]}}, HTTPStatus.BAD_REQUEST),
+    ({'paths': ['a.png'], 'output': {'targets': [{}, {'scale': 0.5}]}}, HTTPStatus.BAD_REQUEST),
+])
+def test_parse_job_rejects_invalid_jobs(roots, job, status):
+    with pytest.raises(JobError) as error:
+        parse_job(job_body(**job), *roots)
+    assert error.value.status == status
+
+
+def test_parse_job_resolves_paths_inside_roots(roots):
+    input_root, output_root = roots
+    job = parse_job(job_body(paths=['a.png'], output={'path': 'merged.png', 'targets': [{}, {'suffix': '_t', 'format': 'JPEG'}]}),
+                    input_root, output_root)
+    assert job['sources'] == [os.path.join(input_root, 'a.png')]
+    assert job['save_path'] == os.path.join(output_root, 'merged.png')
+    assert len(job['targets']) == 2
+
+
+def test_file_access_is_disabled_without_roots():
+    with pytest.raises(JobError) as error:
+        parse_job(job_body(paths=['a.png']))
+    assert error.value.status == HTTPStatus.FORBIDDEN
+
+
+def test_queue_full_is_rejected():
+    async def scenario():
+        service = MergeService(workers=1, queue_size=1)
+        service.queue = asyncio.Queue(maxsize=1)
+        service.queue.put_nowait(None)
+        with pytest.raises(JobError) as error:
+            await service.merge(job_body(images=[base64.b64encode(encoded_image()).decode('ascii')]))
+        return error.value.status, service.counters['rejected'], service.in_flight_memory
+
+    assert asyncio.run(scenario()) == (HTTPStatus.SERVICE_UNAVAILABLE, 1, 0)
+
+
+def test_memory_budget_is_enforced():
+    service = MergeService(workers=1, max_memory=100)
+    # A request alone in the service is admitted even above the budget
+    first = service.admit(150)
+    with pytest.raises(JobError) as error:
+        service.admit(10)
+    assert error.value.status == HTTPStatus.SERVICE_UNAVAILABLE
+    service.release(first)
+    assert service.in_flight_memory == 0
+    assert service.admit(10) == 10
+
+
+def test_round_trip(roots):
+    async def scenario():
+        service = MergeService(workers=1, output_root=roots[1])
+        await service.start()
+        server = await asyncio.start_server(MergeServer(service).handle_connection, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        try:
+            images = [base64.b64encode(encoded_image(color=color)).decode('ascii') for color in ('red', 'blue')]
+            status, headers, data = await request(reader, writer, 'POST', '/merge',
+                                                  job_body(images=images, layout='Horizontal'))
+            assert status == HTTPStatus.OK
+            assert headers['content-type'] == 'image/png'
+            with Image.open(io.BytesIO(data)) as img:
+                assert img.size == (80, 30)
+
+            status, _, data = await request(reader, writer, 'POST', '/merge',
+                                            job_body(images=images, output={'path': 'merged.png'}))
+            assert status == HTTPStatus.OK
+            assert json.loads(data) == {'paths': [os.path.join(os.path.realpath(roots[1]), 'merged.png')]}
+
+            status, _, data = await request(reader, writer, 'GET', '/health')
+            assert status == HTTPStatus.OK
+            assert json.loads(data)['status'] == 'ok'
+
+            status, _, data = await request(reader, writer, 'GET', '/metrics')
+            metrics = json.loads(data)
+            assert metrics['completed'] == 2
+            assert metrics['in_flight_memory'] == 0
+            assert metrics['latency_ms']['merge']['count'] == 2
+        finally:
+            writer.close()
+            server.close()
+            await server.wait_closed()
+            await service.stop()
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize('headers, status', [
+    ({'Content-Type': 'text/plain'}, HTTPStatus.UNSUPPORTED_MEDIA_TYPE),
+    ({'Content-Type': 'application/json', 'Origin': 'http://evil.example'}, HTTPStatus.FORBIDDEN),
+    ({'Content-Type': 'application/json', 'Host': 'evil.example'}, HTTPStatus.FORBIDDEN),
+])
+def test_browser_requests_are_refused(headers, status):
+    async def scenario():
+        service = MergeService(workers=1)
+        await service.start()
+        server = await asyncio.start_server(MergeServer(service).handle_connection, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        try:
+            body = job_body(images=[base64.b64encode(encoded_image()).decode('ascii')])
+            head = {'Host': 'localhost', 'Content-Length': len(body), **headers}
+            writer.write(b'POST /merge HTTP/1.1\r\n' + ''.join(f'{k}: {v}\r\n' for k, v in head.items()).encode('latin-1')
+                         + b'\r\n' + body)
+            await writer.drain()
+            return int((await reader.readline()).split()[1])
+        finally:
+            writer.close()
+            server.close()
+            await server.wait_closed()
+            await service.stop()
+
+    assert asyncio.run(scenario()) == status
@@ -0,0 +1,172 @@
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PicFusion_watch import FolderWatcher, read_manifest
+
+
+def write_image(path, size=(40, 30), color='red'):
+    Image.new('RGB', size, color).save(path)
+
+
+def settle(watcher, polls=2):
+    # A file is picked up on the poll after the one that first saw it unchanged
+    for _ in range(polls):
+        watcher.poll()
+
+
+def drain(watcher):
+    # Wait for every submitted merge to finish
+    watcher.executor.shutdown(wait=True)
+    watcher.decoder.shutdown(wait=True)
+
+
+def outputs(output_dir):
+    return sorted(os.listdir(output_dir)) if os.path.isdir(output_dir) else []
+
+
+@pytest.fixture
+def folders(tmp_path):
+    folder = tmp_path / 'in'
+    folder.mkdir()
+    return str(folder), str(tmp_path / 'out')
+
+
+def test_growing_file_is_skipped_until_it_settles(folders):
+    folder, output_dir = folders
+    watcher = FolderWatcher(folder, output_dir, count=1)
+    path = os.path.join(folder, 'a.png')
+    with open(path, 'wb') as partial:
+        partial.write(b'\x89PNG')
+
+    assert watcher.scan() == []
+    with open(path, 'ab') as partial:
+        partial.write(b'\x00' * 16)
+    assert watcher.scan() == []
+    assert watcher.scan() == [path]
+
+
+def test_count_grouping(folders):
+    folder, output_dir = folders
+    watcher = FolderWatcher(folder, output_dir, layout='Horizontal', count=2)
+    for idx in range(5):
+        write_image(os.path.join(folder, f'{idx}.png'))
+    settle(watcher)
+    assert len(watcher.job.paths) == 1
+    drain(watcher)
+
+    merged = outputs(output_dir)
+    assert len(merged) == 2
+    for name in merged:
+        with Image.open(os.path.join(output_dir, name)) as img:
+            assert img.size == (80, 30)
+
+
+def test_window_grouping_flushes_after_quiet_gap(folders):
+    folder, output_dir = folders
+    watcher = FolderWatcher(folder, output_dir, window=0.05)
+    for idx in range(3):
+        write_image(os.path.join(folder, f'{idx}.png'))
+    settle(watcher)
+    assert len(watcher.job.paths) == 3
+
+    time.sleep(0.1)
+    watcher.poll()
+    assert watcher.job is None
+    drain(watcher)
+    with Image.open(os.path.join(output_dir, outputs(output_dir)[0])) as img:
+        assert img.size == (40, 90)
+
+
+def test_window_grouping_flushes_at_max_wait(folders):
+    folder, output_dir = folders
+    watcher = FolderWatcher(folder, output_dir, window=60, max_wait=0.05)
+    write_image(os.path.join(folder, 'a.png'))
+    settle(watcher)
+    assert watcher.job is not None
+
+    time.sleep(0.1)
+    watcher.poll()
+    assert watcher.job is None
+    drain(watcher)
+    assert len(outputs(output_dir)) == 1
+
+
+def test_manifest_job(folders):
+    folder, output_dir = folders
+    watcher = FolderWatcher(folder, output_dir, manifest=True)
+    for name in ('a.png', 'b.png', 'orphan.png'):
+        write_image(os.path.join(folder, name))
+    with open(os.path.join(folder, 'job.json'), 'w') as manifest:
+        json.dump({'files': ['a.png', 'b.png'], 'layout': 'Horizontal', 'output': '../ab.png'}, manifest)
+    settle(watcher)
+    drain(watcher)
+
+    assert outputs(output_dir) == ['ab.png']
+    with Image.open(os.path.join(output_dir, 'ab.png')) as img:
+        assert img.size == (80, 30)
+
+
+def test_manifest_with_duplicate_names_is_rejected(folders):
+    folder, output_dir = folders
+    watcher = FolderWatcher(folder, output_dir, manifest=True)
+    write_image(os.path.join(folder, 'a.png'))
+    manifest_path = os.path.join(folder, 'job.json')
+    with open(manifest_path, 'w') as manifest:
+        json.dump({'files': ['a.png', 'sub/a.png']}, manifest)
+
+    with pytest.raises(ValueError):
+        read_manifest(manifest_path)
+    settle(watcher, polls=3)
+    drain(watcher)
+    assert watcher.manifests == {}
+    assert outputs(output_dir) == []
+
+
+def test_rewritten_manifest_is_read_again(folders):
+    folder, output_dir = folders
+    watcher = FolderWatcher(folder, output_dir, manifest=True)
+    for name in ('a.png', 'b.png'):
+        write_image(os.path.join(folder, name))
+    manifest_path = os.path.join(folder, 'job.json')
+    with open(manifest_path, 'w') as manifest:
+        manifest.write('{"files": ["a.png"')
+    settle(watcher)
+    assert watcher.manifests == {}
+
+    with open(manifest_path, 'w') as manifest:
+        json.dump({'files': ['a.png', 'b.png'], 'output': 'job.png'}, manifest)
+    os.utime(manifest_path, ns=(time.time_ns(), time.time_ns() + 10 ** 9))
+    settle(watcher)
+    drain(watcher)
+    with Image.open(os.path.join(output_dir, 'job.png')) as img:
+        assert img.size == (40, 60)
+
+
+def test_failed_decode_is_retried_after_rewrite(folders):
+    folder, output_dir = folders
+    watcher = FolderWatcher(folder, output_dir, count=1)
+    path = os.path.join(folder, 'a.png')
+    with open(path, 'wb') as broken:
+        broken.write(b'not an image')
+    settle(watcher)
+    watcher.executor.shutdown(wait=True)
+    assert outputs(output_dir) == []
+
+    # The failure is recorded on the next poll and the unchanged file is not picked up again
+    settle(watcher)
+    assert watcher.seen[path] == os.stat(path).st_mtime_ns
+
+    watcher.executor = ThreadPoolExecutor(max_workers=2)
+    write_image(path)
+    os.utime(path, ns=(time.time_ns(), time.time_ns() + 10 ** 9))
+    settle(watcher)
+    drain(watcher)
+    assert len(outputs(output_dir)) == 1